@@ -12,9 +12,22 @@ Example feature flags:
 - "multi_currency": Enable multi-currency support
 """
 
+from types import MappingProxyType
+
 from common.enums import FeatureFlags
 from services.group_package_service import GroupPackageService
 
+# Feature flag keys, resolved once from common.enums.FeatureFlags
+_TRANSACTION_ANNOTATION = FeatureFlags.TRANSACTION_ANNOTATION.value
+_DAILY_BUSINESS_REPORTS = FeatureFlags.DAILY_BUSINESS_REPORTS.value
+_ADVANCED_ANALYTICS = FeatureFlags.ADVANCED_ANALYTICS.value
+_CUSTOM_EXPORT = FeatureFlags.CUSTOM_EXPORT.value
+_MULTI_CURRENCY = FeatureFlags.MULTI_CURRENCY.value
+_PREMIUM_SUPPORT = FeatureFlags.PREMIUM_SUPPORT.value
+_SHIFT_MANAGEMENT = FeatureFlags.SHIFT_MANAGEMENT.value
+_SHIFT_PERMISSIONS = FeatureFlags.SHIFT_PERMISSIONS.value
+_API_ACCESS = FeatureFlags.API_ACCESS.value
+
 
 # Example usage functions
 async def example_usage():
@@ -23,26 +36,32 @@ async def example_usage():
     service = GroupPackageService()
     chat_id = 123456789  # Example chat ID
     
-    # 1. Set individual feature flags
-    print("Setting individual feature flags...")
-    await service.set_feature_flag(chat_id, FeatureFlags.TRANSACTION_ANNOTATION.value, True)
-    await service.set_feature_flag(chat_id, FeatureFlags.DAILY_BUSINESS_REPORTS.value, True)
-    await service.set_feature_flag(chat_id, FeatureFlags.ADVANCED_ANALYTICS.value, False)
+    # 1. Set a single feature flag
+    print("Setting a single feature flag...")
+    await service.set_feature_flag(chat_id, _TRANSACTION_ANNOTATION, True)
     
-    # 2. Set multiple feature flags at once
+    # 2. Set multiple feature flags at once (one database write, prefer this
+    #    over calling set_feature_flag in a loop)
     print("Setting multiple feature flags...")
     feature_flags = {
-        FeatureFlags.CUSTOM_EXPORT.value: True,
-        FeatureFlags.MULTI_CURRENCY.value: True,
-        FeatureFlags.PREMIUM_SUPPORT.value: True
+        _DAILY_BUSINESS_REPORTS: True,
+        _ADVANCED_ANALYTICS: False,
+        _CUSTOM_EXPORT: True,
+        _MULTI_CURRENCY: True,
+        _PREMIUM_SUPPORT: True
     }
     await service.update_feature_flags(chat_id, feature_flags)
     
     # 3. Check if features are enabled
     print("Checking feature flags...")
-    has_annotation = await service.has_feature(chat_id, FeatureFlags.TRANSACTION_ANNOTATION.value)
-    has_reports = await service.get_feature_flag(chat_id, FeatureFlags.DAILY_BUSINESS_REPORTS.value)
-    has_analytics = await service.get_feature_flag(chat_id, FeatureFlags.ADVANCED_ANALYTICS.value, default=False)
+    features = await service.has_features(chat_id, [
+        _TRANSACTION_ANNOTATION,
+        _DAILY_BUSINESS_REPORTS,
+        _ADVANCED_ANALYTICS,
+    ])
+    has_annotation = features[_TRANSACTION_ANNOTATION]
+    has_reports = features[_DAILY_BUSINESS_REPORTS]
+    has_analytics = features[_ADVANCED_ANALYTICS]
     
     print(f"Transaction annotation: {has_annotation}")
     print(f"Daily business reports: {has_reports}")
@@ -55,16 +74,17 @@ async def example_usage():
     
     # 5. Remove a feature flag
     print("Removing a feature flag...")
-    await service.remove_feature_flag(chat_id, FeatureFlags.ADVANCED_ANALYTICS.value)
+    await service.remove_feature_flag(chat_id, _ADVANCED_ANALYTICS)
     
     # 6. Using feature flags in business logic
     print("Example business logic usage...")
-    if await service.has_feature(chat_id, FeatureFlags.TRANSACTION_ANNOTATION.value):
+    flags = await service.get_all_feature_flags(chat_id)
+    if flags.get(_TRANSACTION_ANNOTATION, False):
         print("Show transaction annotation UI")
     else:
         print("Hide transaction annotation UI")
     
-    if await service.has_feature(chat_id, FeatureFlags.DAILY_BUSINESS_REPORTS.value):
+    if flags.get(_DAILY_BUSINESS_REPORTS, False):
         print("Enable daily reports for business groups")
     else:
         print("Disable daily reports for business groups")
@@ -79,10 +99,11 @@ async def example_bot_integration():
     async def handle_menu_command(chat_id: int):
         """Example menu handler with feature flags"""
         
-        # Check if advanced features are enabled
-        has_annotation = await service.has_feature(chat_id, FeatureFlags.TRANSACTION_ANNOTATION.value)
-        has_daily_reports = await service.has_feature(chat_id, FeatureFlags.DAILY_BUSINESS_REPORTS.value)
-        has_custom_export = await service.has_feature(chat_id, FeatureFlags.CUSTOM_EXPORT.value)
+        # Check if advanced features are enabled (one lookup for all flags)
+        flags = await service.get_all_feature_flags(chat_id)
+        has_annotation = flags.get(_TRANSACTION_ANNOTATION, False)
+        has_daily_reports = flags.get(_DAILY_BUSINESS_REPORTS, False)
+        has_custom_export = flags.get(_CUSTOM_EXPORT, False)
         
         menu_options = ["📊 Basic Reports", "💰 View Balance"]
         
@@ -100,51 +121,48 @@ async def example_bot_integration():
     async def handle_export_command(chat_id: int):
         """Example export handler with feature flags"""
         
-        if not await service.has_feature(chat_id, FeatureFlags.CUSTOM_EXPORT.value):
+        if not await service.has_feature(chat_id, _CUSTOM_EXPORT):
             return "❌ Custom export feature is not enabled for your package"
         
         # Proceed with custom export logic
         return "✅ Custom export available"
 
 
-# Feature flag constants are now imported from common.enums.FeatureFlags
+# Example package-based feature defaults, built once and read-only
+_PACKAGE_FEATURES = {
+    "TRIAL": MappingProxyType({
+        _TRANSACTION_ANNOTATION: False,
+        _DAILY_BUSINESS_REPORTS: False,
+        _ADVANCED_ANALYTICS: False,
+        _CUSTOM_EXPORT: False,
+    }),
+    "STANDARD": MappingProxyType({
+        _TRANSACTION_ANNOTATION: True,
+        _DAILY_BUSINESS_REPORTS: True,
+        _ADVANCED_ANALYTICS: False,
+        _CUSTOM_EXPORT: False,
+    }),
+    "BUSINESS": MappingProxyType({
+        _TRANSACTION_ANNOTATION: True,
+        _DAILY_BUSINESS_REPORTS: True,
+        _ADVANCED_ANALYTICS: True,
+        _CUSTOM_EXPORT: True,
+        _SHIFT_MANAGEMENT: True,
+        _SHIFT_PERMISSIONS: True,
+        _API_ACCESS: True,
+    }),
+}
 
 
-# Example package-based feature defaults
 async def setup_package_features(chat_id: int, package_type: str):
     """Setup default features based on package type"""
     
     service = GroupPackageService()
     
-    if package_type == "TRIAL":
-        features = {
-            FeatureFlags.TRANSACTION_ANNOTATION.value: False,
-            FeatureFlags.DAILY_BUSINESS_REPORTS.value: False,
-            FeatureFlags.ADVANCED_ANALYTICS.value: False,
-            FeatureFlags.CUSTOM_EXPORT.value: False,
-        }
-    elif package_type == "STANDARD":
-        features = {
-            FeatureFlags.TRANSACTION_ANNOTATION.value: True,
-            FeatureFlags.DAILY_BUSINESS_REPORTS.value: True,
-            FeatureFlags.ADVANCED_ANALYTICS.value: False,
-            FeatureFlags.CUSTOM_EXPORT.value: False,
-        }
-    elif package_type == "BUSINESS":
-        features = {
-            FeatureFlags.TRANSACTION_ANNOTATION.value: True,
-            FeatureFlags.DAILY_BUSINESS_REPORTS.value: True,
-            FeatureFlags.ADVANCED_ANALYTICS.value: True,
-            FeatureFlags.CUSTOM_EXPORT.value: True,
-            FeatureFlags.SHIFT_MANAGEMENT.value: True,
-            FeatureFlags.SHIFT_PERMISSIONS.value: True,
-            FeatureFlags.API_ACCESS.value: True,
-        }
-    else:
-        features = {}
+    features = _PACKAGE_FEATURES.get(package_type, {})
     
     await service.update_feature_flags(chat_id, features)
-    print(f"Setup features for {package_type} package: {features}")
+    print(f"Setup features for {package_type} package: {dict(features)}")
 
 
 if __name__ == "__main__":
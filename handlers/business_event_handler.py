@@ -160,7 +160,7 @@ class BusinessEventHandler:
 
     async def handle_business_callback(self, event):
         """Handle business-specific callback queries"""
-        data = event.data.decode("utf-8")
+        data = event.data
         force_log(f"handle_business_callback received data: {data}", "BusinessEventHandler", "DEBUG")
 
         if data == "current_shift_report":
@@ -1,9 +1,26 @@
 import datetime
 import os
+import traceback
 
+# Numeric severity of force_log levels, used to filter against LOG_LEVEL
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARN": 30, "WARNING": 30, "ERROR": 40}
+
+
+def force_log(message, component="System", level="INFO", *args, exc_info=False):
+    """Write logs with hourly rotation
+
+    Like logging, ``message % args`` and the traceback for ``exc_info`` are only
+    formatted when ``level`` is at or above the LOG_LEVEL environment variable.
+    """
+    min_level = os.getenv("LOG_LEVEL", "DEBUG").upper()
+    if LOG_LEVELS.get(level, 20) < LOG_LEVELS.get(min_level, 10):
+        return
+
+    if args:
+        message = message % args
+    if exc_info:
+        message = f"{message}\n{traceback.format_exc().rstrip()}"
 
-def force_log(message, component="System", level="INFO"):
-    """Write logs with hourly rotation"""
     try:
         # Ensure logs directory exists
         logs_dir = "logs"
@@ -6,6 +6,12 @@ from typing import Set
 from alembic import command
 from alembic.config import Config
 
+try:
+    # Faster event loop on Linux; optional so Windows dev environments still work
+    import uvloop
+except ImportError:
+    uvloop = None
+
 from config import load_environment
 
 load_environment()
@@ -143,7 +149,10 @@ if __name__ == "__main__":
     try:
         loader = CredentialLoader()
         loader.load_credentials(mode="bots_only")
-        asyncio.run(main(loader))
+        if uvloop:
+            uvloop.run(main(loader))
+        else:
+            asyncio.run(main(loader))
 
     except KeyboardInterrupt:
         print("\nBots stopped by user")
\ No newline at end of file
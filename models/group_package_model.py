@@ -45,12 +45,15 @@ class GroupPackage(BaseModel):
         if not self.feature_flags:
             return default
         
-        value = self.feature_flags.get(key, default)
-        
+        return self.parse_feature_flag(self.feature_flags.get(key, default))
+
+    @staticmethod
+    def parse_feature_flag(value) -> bool:
+        """Normalize a stored feature flag value to a bool"""
         # Handle string representations of booleans from MySQL JSON
         if isinstance(value, str):
             return value.lower() in ('true', '1', 'yes')
-        
+
         return bool(value)
     
     def set_feature_flag(self, key: str, value: bool) -> None:
@@ -1,39 +1,77 @@
 import asyncio
 
-from helper.logger_utils import force_log
+from helper import force_log, DateUtils
 from services import ShiftService
 from services.chat_service import ChatService
 from services.private_bot_group_binding_service import PrivateBotGroupBindingService
 from services.telegram_business_bot_service import AutosumBusinessBot
 
+# Auto-close shift summary message templates
+_SHIFT_SUMMARY_TEMPLATE = (
+    "🔒 វេន #{number} បានបិទដោយស្វ័យប្រវត្តិ\n"
+    "\n"
+    "{income_section}"
+    "📝 ព័ត៌មានលម្អិត:\n"
+    "• ពេលចាប់ផ្តើមវេន: {start_time}\n"
+    "• ពេលបញ្ចប់វេន: {end_time}\n"
+    "\n"
+    "⚡ បិទដោយ: ការកំណត់ពេលវេលាស្វ័យប្រវត្តិ"
+)
+_INCOME_SECTION_TEMPLATE = "📊 សរុបចំណូល:\n{currency_text}\n\n"
+_NO_TRANSACTIONS_TEXT = "• មិនមានប្រតិបត្តិការ"
+
+# Per-currency income lines, KHR amounts are whole riel
+_DEFAULT_CURRENCY_LINE = "• {currency}: {amount:,.2f} ({count} ប្រតិបត្តិការ)".format
+_CURRENCY_LINE_FORMATS = {
+    "USD": "• {currency}: ${amount:,.2f} ({count} ប្រតិបត្តិការ)".format,
+    "KHR": "• {currency}: ៛{amount:,} ({count} ប្រតិបត្តិការ)".format,
+}
+
 
 class AutoCloseScheduler:
-    """Dedicated scheduler for auto-closing shifts that runs every minute"""
+    """Dedicated scheduler for auto-closing shifts that runs at the start of every minute"""
+
+    # Max shift summaries sent at once, to stay under Telegram's rate limits
+    MAX_CONCURRENT_SENDS = 10
 
     def __init__(self, bot_service: AutosumBusinessBot):
         self.shift_service = ShiftService()
         self.chat_service = ChatService()
         self.bot_service = bot_service
         self.is_running = False
+        self._stop_event = asyncio.Event()
+        self._send_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_SENDS)
 
     async def start_scheduler(self):
         """Start the auto-close scheduler to run every minute"""
         self.is_running = True
+        self._stop_event.clear()
         force_log("Auto-close scheduler started - will run every minute", "AutoCloseScheduler")
 
         while self.is_running:
             try:
                 await self.check_auto_close_shifts()
-                # Wait 1 minute (60 seconds) before next run
-                await asyncio.sleep(60)
             except Exception as e:
                 force_log(f"Error in auto-close scheduler loop: {e}", "AutoCloseScheduler", "ERROR")
-                # Wait 1 minute before retrying if there's an error
-                await asyncio.sleep(60)
+
+            # Wait for the next minute boundary, or until the scheduler is stopped
+            try:
+                await asyncio.wait_for(
+                    self._stop_event.wait(), timeout=self._seconds_until_next_minute()
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    def _seconds_until_next_minute() -> float:
+        """Seconds until second 0 of the next minute, so runs line up with HH:MM close times"""
+        now = DateUtils.now()
+        return 60 - now.second - now.microsecond / 1_000_000
 
     async def stop_scheduler(self):
         """Stop the auto-close scheduler"""
         self.is_running = False
+        self._stop_event.set()
         force_log("Auto-close scheduler stopped", "AutoCloseScheduler")
 
     async def check_auto_close_shifts(self):
@@ -46,28 +84,42 @@ class AutoCloseScheduler:
 
             if closed_shifts:
                 force_log(
-                    f"Auto-closed {len(closed_shifts)} shifts: {[shift['id'] for shift in closed_shifts]}", "AutoCloseScheduler"
+                    "Auto-closed %d shifts: %s", "AutoCloseScheduler", "INFO",
+                    len(closed_shifts), [shift['id'] for shift in closed_shifts],
                 )
 
-                # Send shift summaries to chats
                 for shift in closed_shifts:
                     force_log(
-                        f"Auto-closed shift {shift['id']} for chat {shift['chat_id']}", "AutoCloseScheduler"
+                        "Auto-closed shift %s for chat %s", "AutoCloseScheduler", "INFO",
+                        shift['id'], shift['chat_id'],
                     )
 
-                    # Send shift summary to chat if bot service is available
-                    if self.bot_service:
-                        await self._send_shift_summary(shift)
+                # Send shift summaries to chats concurrently if bot service is available
+                if self.bot_service:
+                    summaries = await self.shift_service.get_shift_income_summaries(
+                        [(shift["id"], shift["chat_id"]) for shift in closed_shifts]
+                    )
+                    results = await asyncio.gather(
+                        *(
+                            self._send_shift_summary(shift, summaries[shift["id"]])
+                            for shift in closed_shifts
+                        ),
+                        return_exceptions=True,
+                    )
+                    for shift, result in zip(closed_shifts, results):
+                        if isinstance(result, Exception):
+                            force_log(
+                                f"Error sending shift summary for shift {shift['id']}: {result}",
+                                "AutoCloseScheduler",
+                                "ERROR",
+                            )
             else:
                 force_log("No shifts needed auto-closing", "AutoCloseScheduler", "DEBUG")
 
         except Exception as e:
-            force_log(f"Error in auto-close shift check: {e}", "AutoCloseScheduler", "ERROR")
-            import traceback
-
-            force_log(f"Traceback: {traceback.format_exc()}", "AutoCloseScheduler", "ERROR")
+            force_log(f"Error in auto-close shift check: {e}", "AutoCloseScheduler", "ERROR", exc_info=True)
 
-    async def _send_shift_summary(self, shift_info: dict):
+    async def _send_shift_summary(self, shift_info: dict, summary: dict):
         """Send shift summary to the chat"""
         try:
             chat_id = shift_info["chat_id"]
@@ -76,11 +128,6 @@ class AutoCloseScheduler:
 
             # Get shift details for timing information
             shift = await self.shift_service.get_shift_by_id(shift_id)
-            
-            # Get shift summary
-            summary = await self.shift_service.get_shift_income_summary(
-                shift_id, chat_id
-            )
 
             # Check if this group uses private bot binding
             chat = await self.chat_service.get_chat_by_chat_id(chat_id)
@@ -91,59 +138,34 @@ class AutoCloseScheduler:
             # Format the summary message
             if uses_private_bot:
                 # For private groups, don't include transaction summary
-                message = f"""
-🔒 វេន #{shift_number} បានបិទដោយស្វ័យប្រវត្តិ
-
-📝 ព័ត៌មានលម្អិត:
-• ពេលចាប់ផ្តើមវេន: {shift.start_time.strftime('%I:%M:%S %p')}
-• ពេលបញ្ចប់វេន: {shift.end_time.strftime('%I:%M:%S %p')}
-
-⚡ បិទដោយ: ការកំណត់ពេលវេលាស្វ័យប្រវត្តិ
-                """.strip()
+                income_section = ""
             else:
                 # For regular groups, include transaction summary as before
                 if summary["transaction_count"] > 0:
                     # Format currency breakdown
                     currency_details = []
                     for currency, data in summary['currencies'].items():
-                        if currency == 'USD':
-                            currency_details.append(f"• {currency}: ${data['amount']:,.2f} ({data['count']} ប្រតិបត្តិការ)")
-                        elif currency == 'KHR':
-                            khr_amount = int(data['amount'])
-                            currency_details.append(f"• {currency}: ៛{khr_amount:,} ({data['count']} ប្រតិបត្តិការ)")
-                        else:
-                            currency_details.append(f"• {currency}: {data['amount']:,.2f} ({data['count']} ប្រតិបត្តិការ)")
-                    
-                    currency_text = "\n".join(currency_details)
-
-                    message = f"""
-🔒 វេន #{shift_number} បានបិទដោយស្វ័យប្រវត្តិ
+                        amount = int(data['amount']) if currency == 'KHR' else data['amount']
+                        format_line = _CURRENCY_LINE_FORMATS.get(currency, _DEFAULT_CURRENCY_LINE)
+                        currency_details.append(
+                            format_line(currency=currency, amount=amount, count=data['count'])
+                        )
 
-📊 សរុបចំណូល:
-{currency_text}
-
-📝 ព័ត៌មានលម្អិត:
-• ពេលចាប់ផ្តើមវេន: {shift.start_time.strftime('%I:%M:%S %p')}
-• ពេលបញ្ចប់វេន: {shift.end_time.strftime('%I:%M:%S %p')}
-
-⚡ បិទដោយ: ការកំណត់ពេលវេលាស្វ័យប្រវត្តិ
-                    """.strip()
+                    currency_text = "\n".join(currency_details)
                 else:
-                    message = f"""
-🔒 វេន #{shift_number} បានបិទដោយស្វ័យប្រវត្តិ
-
-📊 សរុបចំណូល:
-• មិនមានប្រតិបត្តិការ
-
-📝 ព័ត៌មានលម្អិត:
-• ពេលចាប់ផ្តើមវេន: {shift.start_time.strftime('%I:%M:%S %p')}
-• ពេលបញ្ចប់វេន: {shift.end_time.strftime('%I:%M:%S %p')}
-
-⚡ បិទដោយ: ការកំណត់ពេលវេលាស្វ័យប្រវត្តិ
-                    """.strip()
+                    currency_text = _NO_TRANSACTIONS_TEXT
+                income_section = _INCOME_SECTION_TEMPLATE.format(currency_text=currency_text)
+
+            message = _SHIFT_SUMMARY_TEMPLATE.format(
+                number=shift_number,
+                income_section=income_section,
+                start_time=shift.start_time.strftime('%I:%M:%S %p'),
+                end_time=shift.end_time.strftime('%I:%M:%S %p'),
+            )
 
             # Send message
-            success = await self.bot_service.send_message(chat_id, message)
+            async with self._send_semaphore:
+                success = await self.bot_service.send_message(chat_id, message)
             if success:
                 force_log(f"Sent shift summary for shift {shift_id} to chat {chat_id}", "AutoCloseScheduler")
             else:
@@ -153,8 +175,6 @@ class AutoCloseScheduler:
 
         except Exception as e:
             force_log(
-                f"Error sending shift summary for shift {shift_info.get('id', 'unknown')}: {e}", "AutoCloseScheduler", "ERROR"
+                f"Error sending shift summary for shift {shift_info.get('id', 'unknown')}: {e}", "AutoCloseScheduler", "ERROR",
+                exc_info=True,
             )
-            import traceback
-
-            force_log(f"Shift summary error traceback: {traceback.format_exc()}", "AutoCloseScheduler", "ERROR")
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime
 
 from common.enums import ServicePackage
@@ -5,8 +6,16 @@ from config import get_db_session
 from helper import DateUtils
 from models import GroupPackage
 
+# Process-wide cache of feature flags keyed by chat_id: (expires_at, flags)
+FEATURE_FLAGS_CACHE_TTL = 60
+_feature_flags_cache: dict[int, tuple[float, dict[str, bool]]] = {}
+
 
 class GroupPackageService:
+    @staticmethod
+    def _invalidate_feature_flags(chat_id: int) -> None:
+        _feature_flags_cache.pop(chat_id, None)
+
     async def _get_chat_group_id_by_chat_id(self, chat_id: int) -> int | None:
         with get_db_session() as db:
             from models.chat_model import Chat
@@ -48,6 +57,7 @@ class GroupPackageService:
                 db.add(group_package)
                 db.commit()
                 db.refresh(group_package)
+                self._invalidate_feature_flags(chat_id)
                 return group_package
             except Exception as e:
                 db.rollback()
@@ -105,15 +115,17 @@ class GroupPackageService:
     async def update_feature_flags(
         self, chat_id: int, feature_flags: dict[str, bool]
     ) -> GroupPackage | None:
-        """Update feature flags for a group package"""
-        chat_group_id = await self._get_chat_group_id_by_chat_id(chat_id)
-        if not chat_group_id:
-            return None
-
+        """Update feature flags for a group package in a single read-modify-write"""
         with get_db_session() as db:
+            from models.chat_model import Chat
+
+            # Resolve the package through its chat in one query, locking the row
+            # so concurrent updates merge into the latest flags
             group_package = (
                 db.query(GroupPackage)
-                .filter(GroupPackage.chat_group_id == chat_group_id)
+                .join(Chat, GroupPackage.chat_group_id == Chat.id)
+                .filter(Chat.chat_id == chat_id)
+                .with_for_update()
                 .first()
             )
 
@@ -132,6 +144,7 @@ class GroupPackageService:
 
                 db.commit()
                 db.refresh(group_package)
+                self._invalidate_feature_flags(chat_id)
                 return group_package
             return None
 
@@ -145,15 +158,20 @@ class GroupPackageService:
         self, chat_id: int, key: str, default: bool = False
     ) -> bool:
         """Get a feature flag value for a chat"""
-        package = await self.get_package_by_chat_id(chat_id)
-        if not package:
-            return default
-        return package.get_feature_flag(key, default)
+        flags = await self._get_cached_feature_flags(chat_id)
+        return GroupPackage.parse_feature_flag(flags.get(key, default))
 
     async def has_feature(self, chat_id: int, key: str) -> bool:
         """Check if a feature is enabled for a chat (convenience method)"""
         return await self.get_feature_flag(chat_id, key, False)
 
+    async def has_features(self, chat_id: int, keys: list[str]) -> dict[str, bool]:
+        """Check several features for a chat with a single lookup"""
+        flags = await self._get_cached_feature_flags(chat_id)
+        return {
+            key: GroupPackage.parse_feature_flag(flags.get(key, False)) for key in keys
+        }
+
     async def remove_feature_flag(
         self, chat_id: int, key: str
     ) -> GroupPackage | None:
@@ -175,12 +193,24 @@ class GroupPackageService:
                     group_package.updated_at = DateUtils.now()
                     db.commit()
                     db.refresh(group_package)
+                    self._invalidate_feature_flags(chat_id)
                 return group_package
             return None
 
-    async def get_all_feature_flags(self, chat_id: int) -> dict[str, bool]:
-        """Get all feature flags for a chat"""
+    async def _get_cached_feature_flags(self, chat_id: int) -> dict[str, bool]:
+        """Get the shared cached flags dict for a chat; callers must not mutate it"""
+        cached = _feature_flags_cache.get(chat_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
         package = await self.get_package_by_chat_id(chat_id)
-        if not package or not package.feature_flags:
-            return {}
-        return package.feature_flags
+        flags = dict(package.feature_flags) if package and package.feature_flags else {}
+        _feature_flags_cache[chat_id] = (
+            time.monotonic() + FEATURE_FLAGS_CACHE_TTL,
+            flags,
+        )
+        return flags
+
+    async def get_all_feature_flags(self, chat_id: int) -> dict[str, bool]:
+        """Get all feature flags for a chat, served from a short-lived cache"""
+        return dict(await self._get_cached_feature_flags(chat_id))
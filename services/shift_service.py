@@ -185,6 +185,55 @@ class ShiftService:
                 "currencies": currencies,
             }
 
+    async def get_shift_income_summaries(
+        self, shifts: list[tuple[int, int]]
+    ) -> dict[int, dict]:
+        """Get income summaries for several (shift_id, chat_id) pairs in one query"""
+        summaries = {
+            shift_id: {"total_amount": 0.0, "transaction_count": 0, "currencies": {}}
+            for shift_id, _ in shifts
+        }
+        if not shifts:
+            return summaries
+
+        wanted = set(shifts)
+        with get_db_session() as db:
+            from models.income_balance_model import IncomeBalance
+
+            rows = (
+                db.query(
+                    IncomeBalance.shift_id,
+                    IncomeBalance.chat_id,
+                    IncomeBalance.currency,
+                    func.sum(IncomeBalance.amount),
+                    func.count(IncomeBalance.id),
+                )
+                .filter(IncomeBalance.shift_id.in_(list(summaries)))
+                .group_by(
+                    IncomeBalance.shift_id,
+                    IncomeBalance.chat_id,
+                    IncomeBalance.currency,
+                )
+                .all()
+            )
+
+        for shift_id, chat_id, currency, amount, count in rows:
+            if (shift_id, chat_id) not in wanted:
+                continue
+
+            summary = summaries[shift_id]
+            summary["total_amount"] += amount
+            summary["transaction_count"] += count
+
+            # Group by currency
+            currency = currency or "USD"
+            if currency not in summary["currencies"]:
+                summary["currencies"][currency] = {"amount": 0.0, "count": 0}
+            summary["currencies"][currency]["amount"] += amount
+            summary["currencies"][currency]["count"] += count
+
+        return summaries
+
     async def get_recent_dates_with_shifts(
         self, chat_id: int, days: int = 3
     ) -> list[date]:
@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import logging
 
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
@@ -15,7 +17,7 @@ from telegram.ext import (
 from common.enums import ServicePackage
 from handlers.business_event_handler import BusinessEventHandler
 from helper import force_log, DateUtils
-from services import ChatService, UserService, GroupPackageService
+from services import ChatService, UserService, GroupPackageService, IncomeService
 from services.private_bot_group_binding_service import PrivateBotGroupBindingService
 from services.shift_service import ShiftService
 
@@ -29,6 +31,184 @@ BUSINESS_ANALYTICS_CODE = 2003
 BUSINESS_SETTINGS_CODE = 2004
 BUSINESS_CALLBACK_CODE = 2005
 
+# Static command replies, stripped once at import time
+BUSINESS_WELCOME_MESSAGE = """
+🏢 ស្វាគមន៍មកកាន់ Autosum Business!
+
+💼 ជំនួយការហិរញ្ញវត្ថុអាជីវកម្មរបស់អ្នក
+
+បុតនេះផ្តល់នូវមុខងារអាជីវកម្មកម្រិតខ្ពស់:
+• 📊 តាមដានចំណូលពេលវេលាពិត
+• 📈 ការវិភាគនិងចំណេះដឹងអាជីវកម្ម
+• 💰 ការគាំទ្ររូបិយប័ណ្ណច្រើន
+• 📱 ផ្ទាំងគ្រប់គ្រងងាយស្រួលប្រើ
+
+🚀 ការចាប់ផ្តើម:
+1. ប្រើ /menu ដើម្បីចូលទៅផ្ទាំងគ្រប់គ្រងអាជីវកម្ម
+2. ចុះឈ្មោះជជែករបស់អ្នកសម្រាប់សេវាអាជីវកម្ម
+3. ចាប់ផ្តើមតាមដានចំណូលដោយស្វ័យប្រវត្តិ
+
+
+វាយ /menu ដើម្បីចាប់ផ្តើមគ្រប់គ្រងហិរញ្ញវត្ថុអាជីវកម្មរបស់អ្នក!
+""".strip()
+
+BUSINESS_SUPPORT_MESSAGE = """
+📞 មជ្ឈមណ្ឌលការគាំទ្រអាជីវកម្ម
+
+🆘 ជំនួយរហ័ស:
+• បុតមិនឆ្លើយតប? សាកល្បង /start ដើម្បីផ្ទុកឡើងវិញ
+• បាត់ប្រតិបត្តិការ? ពិនិត្យការចុះឈ្មោះជជែក
+• ត្រូវការលក្ខណៈពិសេសផ្ទាល់ខ្លួន? ទាក់ទងក្រុមយើង
+
+📧 ព័ត៌មានទំនាក់ទំនង:
+• អ៊ីមែល: business@autosum.com
+• ទូរស័ព្ទ: +1-XXX-XXX-XXXX
+• ម៉ោងការគាំទ្រ: ច័ន្ទ-សុក្រ 9AM-6PM EST
+
+🚀 សេវាអាជីវកម្ម:
+• ដំណោះស្រាយរបាយការណ៍ផ្ទាល់ខ្លួន
+• ការរួមបញ្ចូល API
+• សម័យប្រមុងក្រុម
+• លក្ខណៈពិសេសការវិភាគកម្រិតខ្ពស់
+
+💬 ការគាំទ្រភ្លាមៗ:
+ឆ្លើយតបសារនេះជាមួយនឹងសំណួររបស់អ្នក ហើយក្រុមយើងនឹងឆ្លើយតបក្នុងរយៈពេល 24 ម៉ោង។
+
+🔗 ធនធាន:
+• មគ្គុទ្ទេសក៍អ្នកប្រើប្រាស់: /help
+• ផ្ទាំងគ្រប់គ្រង: /menu
+• សំណើលក្ខណៈពិសេស: ទាក់ទងក្រុមការគាំទ្រ
+""".strip()
+
+
+@functools.lru_cache(maxsize=256)
+def _buttons_to_markup(buttons: tuple) -> InlineKeyboardMarkup:
+    """Build an InlineKeyboardMarkup from rows of (text, callback_data) tuples.
+
+    Markups are immutable, so identical button layouts share one cached instance.
+    """
+    keyboard_buttons = []
+    for row in buttons:
+        button_row = []
+        for button in row:
+            if isinstance(button, tuple) and len(button) == 2:
+                text, callback_data = button
+                button_row.append(
+                    InlineKeyboardButton(text, callback_data=callback_data)
+                )
+        keyboard_buttons.append(button_row)
+
+    return InlineKeyboardMarkup(keyboard_buttons)
+
+
+class _MockEvent:
+    """Adapts a /menu command update to the event interface of BusinessEventHandler"""
+
+    __slots__ = ("update", "chat_id", "chat", "parent")
+
+    def __init__(self, update: Update, parent: "AutosumBusinessBot"):
+        self.update = update
+        self.chat_id = update.effective_chat.id
+        self.chat = update.effective_chat
+        self.parent = parent
+
+    async def respond(self, message, buttons=None):
+        keyboard = (
+            self.parent._convert_buttons_to_keyboard(buttons)
+            if buttons
+            else None
+        )
+        await self.update.message.reply_text(message, reply_markup=keyboard)
+
+    async def get_sender(self):
+        return self.update.effective_user
+
+
+class _MockCallbackEvent:
+    """Adapts a callback query to the event interface of BusinessEventHandler"""
+
+    __slots__ = ("chat_id", "data", "query", "parent", "chat")
+
+    def __init__(self, query, parent: "AutosumBusinessBot"):
+        self.chat_id = query.message.chat_id
+        self.data = query.data
+        self.query = query
+        self.parent = parent
+        self.chat = query.message.chat
+
+    async def edit(self, message, buttons=None, parse_mode=None):
+        keyboard = (
+            self.parent._convert_buttons_to_keyboard(buttons)
+            if buttons
+            else None
+        )
+        try:
+            await self.query.edit_message_text(message, reply_markup=keyboard, parse_mode=parse_mode)
+        except Exception as e:
+            if "Message is not modified" in str(e):
+                force_log(f"Message content is identical, skipping edit for chat {self.chat_id}", "AutosumBusinessBot")
+                # Just answer the callback to remove loading state
+                await self.query.answer()
+            else:
+                # Re-raise other exceptions
+                raise e
+
+    async def delete(self):
+        """Delete the current message"""
+        try:
+            await self.query.message.delete()
+        except Exception as e:
+            force_log(f"Error deleting message in chat {self.chat_id}: {e}", "AutosumBusinessBot", "WARN")
+
+    async def respond(self, message, buttons=None, parse_mode=None):
+        """Send a new message with optional HTML parsing"""
+        keyboard = (
+            self.parent._convert_buttons_to_keyboard(buttons)
+            if buttons
+            else None
+        )
+        try:
+            await self.parent.app.bot.send_message(
+                chat_id=self.chat_id,
+                text=message,
+                reply_markup=keyboard,
+                parse_mode=parse_mode
+            )
+            # Answer the callback to remove loading state
+            await self.query.answer()
+        except Exception as e:
+            force_log(f"Error responding to chat {self.chat_id}: {e}", "AutosumBusinessBot", "ERROR")
+            raise e
+
+    async def get_sender(self):
+        return self.query.from_user
+
+
+class _MockBackToMenuEvent:
+    """Adapts a back_to_menu callback query so the menu is rendered in place"""
+
+    __slots__ = ("query", "chat_id", "chat", "parent")
+
+    def __init__(self, query, parent: "AutosumBusinessBot"):
+        self.query = query
+        self.chat_id = query.message.chat_id
+        self.chat = query.message.chat
+        self.parent = parent
+
+    async def edit(self, message, buttons=None):
+        keyboard = (
+            self.parent._convert_buttons_to_keyboard(buttons)
+            if buttons
+            else None
+        )
+        await self.query.edit_message_text(message, reply_markup=keyboard)
+
+    async def respond(self, message, buttons=None):
+        await self.edit(message, buttons)
+
+    async def get_sender(self):
+        return self.query.from_user
+
 
 class AutosumBusinessBot:
     """
@@ -43,6 +223,8 @@ class AutosumBusinessBot:
         self.shift_service = ShiftService()
         self.event_handler = BusinessEventHandler(bot_service=self)
         self.group_package_service = GroupPackageService()
+        self.income_service = IncomeService()
+        self._shutdown_event = asyncio.Event()
         force_log("AutosumBusinessBot initialized with token", "AutosumBusinessBot")
 
     async def handle_reply_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -56,9 +238,8 @@ class AutosumBusinessBot:
                 # Check if the original message is from a bot (bank bot)
                 if original_message.from_user and original_message.from_user.is_bot:
                     # Check if this original message exists in our income_balance table
-                    from services.income_balance_service import IncomeService
-                    income_service = IncomeService()
-                    
+                    income_service = self.income_service
+
                     income_record = await income_service.get_income_by_message_id(
                         original_message.message_id, update.effective_chat.id
                     )
@@ -90,44 +271,13 @@ class AutosumBusinessBot:
         if not buttons:
             return None
 
-        keyboard_buttons = []
-        for row in buttons:
-            button_row = []
-            for button in row:
-                if isinstance(button, tuple) and len(button) == 2:
-                    text, callback_data = button
-                    button_row.append(
-                        InlineKeyboardButton(text, callback_data=callback_data)
-                    )
-            keyboard_buttons.append(button_row)
-
-        return InlineKeyboardMarkup(keyboard_buttons)
+        return _buttons_to_markup(tuple(tuple(row) for row in buttons))
 
     async def business_start(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Business bot start command with specialized welcome message"""
-        welcome_message = """
-🏢 ស្វាគមន៍មកកាន់ Autosum Business!
-
-💼 ជំនួយការហិរញ្ញវត្ថុអាជីវកម្មរបស់អ្នក
-
-បុតនេះផ្តល់នូវមុខងារអាជីវកម្មកម្រិតខ្ពស់:
-• 📊 តាមដានចំណូលពេលវេលាពិត
-• 📈 ការវិភាគនិងចំណេះដឹងអាជីវកម្ម
-• 💰 ការគាំទ្ររូបិយប័ណ្ណច្រើន
-• 📱 ផ្ទាំងគ្រប់គ្រងងាយស្រួលប្រើ
-
-🚀 ការចាប់ផ្តើម:
-1. ប្រើ /menu ដើម្បីចូលទៅផ្ទាំងគ្រប់គ្រងអាជីវកម្ម
-2. ចុះឈ្មោះជជែករបស់អ្នកសម្រាប់សេវាអាជីវកម្ម
-3. ចាប់ផ្តើមតាមដានចំណូលដោយស្វ័យប្រវត្តិ
-
-
-វាយ /menu ដើម្បីចាប់ផ្តើមគ្រប់គ្រងហិរញ្ញវត្ថុអាជីវកម្មរបស់អ្នក!
-        """
-
-        await update.message.reply_text(welcome_message)
+        await update.message.reply_text(BUSINESS_WELCOME_MESSAGE)
 
     async def business_menu(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -171,33 +321,13 @@ class AutosumBusinessBot:
             return BUSINESS_MENU_CODE
 
         # Create a mock event object for the business event handler
-        class MockEvent:
-            def __init__(self, update, parent):
-                self.chat_id = update.effective_chat.id
-                self.chat = update.effective_chat
-                self.parent = parent
-
-            async def respond(self, message, buttons=None):
-                keyboard = (
-                    self.parent._convert_buttons_to_keyboard(buttons)
-                    if buttons
-                    else None
-                )
-                await update.message.reply_text(message, reply_markup=keyboard)
-
-            async def get_sender(self):
-                return update.effective_user
-
-        mock_event = MockEvent(update, self)
+        mock_event = _MockEvent(update, self)
 
         try:
             await self.event_handler.menu(mock_event)
             return BUSINESS_MENU_CODE
         except Exception as e:
-            force_log(f"Error in business menu: {e}", "AutosumBusinessBot")
-            import traceback
-
-            force_log(f"Full traceback: {traceback.format_exc()}", "AutosumBusinessBot")
+            force_log(f"Error in business menu: {e}", "AutosumBusinessBot", "ERROR", exc_info=True)
             await update.message.reply_text(
                 "❌ Error loading business menu. Please try again."
             )
@@ -212,62 +342,7 @@ class AutosumBusinessBot:
         await query.answer()
 
         # Create a mock event for the business handler
-        class MockCallbackEvent:
-            def __init__(self, query, parent):
-                self.chat_id = query.message.chat_id
-                self.data = query.data.encode("utf-8")
-                self.query = query
-                self.parent = parent
-                self.chat = query.message.chat
-
-            async def edit(self, message, buttons=None, parse_mode=None):
-                keyboard = (
-                    self.parent._convert_buttons_to_keyboard(buttons)
-                    if buttons
-                    else None
-                )
-                try:
-                    await self.query.edit_message_text(message, reply_markup=keyboard, parse_mode=parse_mode)
-                except Exception as e:
-                    if "Message is not modified" in str(e):
-                        force_log(f"Message content is identical, skipping edit for chat {self.chat_id}", "AutosumBusinessBot")
-                        # Just answer the callback to remove loading state
-                        await self.query.answer()
-                    else:
-                        # Re-raise other exceptions
-                        raise e
-
-            async def delete(self):
-                """Delete the current message"""
-                try:
-                    await self.query.message.delete()
-                except Exception as e:
-                    force_log(f"Error deleting message in chat {self.chat_id}: {e}", "AutosumBusinessBot", "WARN")
-
-            async def respond(self, message, buttons=None, parse_mode=None):
-                """Send a new message with optional HTML parsing"""
-                keyboard = (
-                    self.parent._convert_buttons_to_keyboard(buttons)
-                    if buttons
-                    else None
-                )
-                try:
-                    await self.parent.app.bot.send_message(
-                        chat_id=self.chat_id,
-                        text=message,
-                        reply_markup=keyboard,
-                        parse_mode=parse_mode
-                    )
-                    # Answer the callback to remove loading state
-                    await self.query.answer()
-                except Exception as e:
-                    force_log(f"Error responding to chat {self.chat_id}: {e}", "AutosumBusinessBot", "ERROR")
-                    raise e
-
-            async def get_sender(self):
-                return query.from_user
-
-        mock_event = MockCallbackEvent(query, self)
+        mock_event = _MockCallbackEvent(query, self)
 
         try:
             # Handle business callbacks through event handler
@@ -275,10 +350,7 @@ class AutosumBusinessBot:
             await self.event_handler.handle_business_callback(mock_event)
             return BUSINESS_CALLBACK_CODE
         except Exception as e:
-            force_log(f"Error handling business callback: {e}", "AutosumBusinessBot")
-            import traceback
-
-            force_log(f"Full traceback: {traceback.format_exc()}", "AutosumBusinessBot")
+            force_log(f"Error handling business callback: {e}", "AutosumBusinessBot", "ERROR", exc_info=True)
             await query.edit_message_text(
                 "❌ Error processing request. Please try again."
             )
@@ -288,35 +360,7 @@ class AutosumBusinessBot:
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
         """Business support command"""
-        support_message = """
-📞 មជ្ឈមណ្ឌលការគាំទ្រអាជីវកម្ម
-
-🆘 ជំនួយរហ័ស:
-• បុតមិនឆ្លើយតប? សាកល្បង /start ដើម្បីផ្ទុកឡើងវិញ
-• បាត់ប្រតិបត្តិការ? ពិនិត្យការចុះឈ្មោះជជែក
-• ត្រូវការលក្ខណៈពិសេសផ្ទាល់ខ្លួន? ទាក់ទងក្រុមយើង
-
-📧 ព័ត៌មានទំនាក់ទំនង:
-• អ៊ីមែល: business@autosum.com
-• ទូរស័ព្ទ: +1-XXX-XXX-XXXX
-• ម៉ោងការគាំទ្រ: ច័ន្ទ-សុក្រ 9AM-6PM EST
-
-🚀 សេវាអាជីវកម្ម:
-• ដំណោះស្រាយរបាយការណ៍ផ្ទាល់ខ្លួន
-• ការរួមបញ្ចូល API
-• សម័យប្រមុងក្រុម
-• លក្ខណៈពិសេសការវិភាគកម្រិតខ្ពស់
-
-💬 ការគាំទ្រភ្លាមៗ:
-ឆ្លើយតបសារនេះជាមួយនឹងសំណួររបស់អ្នក ហើយក្រុមយើងនឹងឆ្លើយតបក្នុងរយៈពេល 24 ម៉ោង។
-
-🔗 ធនធាន:
-• មគ្គុទ្ទេសក៍អ្នកប្រើប្រាស់: /help
-• ផ្ទាំងគ្រប់គ្រង: /menu
-• សំណើលក្ខណៈពិសេស: ទាក់ទងក្រុមការគាំទ្រ
-        """
-
-        await update.message.reply_text(support_message)
+        await update.message.reply_text(BUSINESS_SUPPORT_MESSAGE)
 
     async def register_chat(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -514,27 +558,7 @@ class AutosumBusinessBot:
         await query.answer()
 
         # Create a mock event to call the menu handler
-        class MockEvent:
-            def __init__(self, update, parent):
-                self.chat_id = update.callback_query.message.chat_id
-                self.chat = update.callback_query.message.chat
-                self.parent = parent
-
-            async def edit(self, message, buttons=None):
-                keyboard = (
-                    self.parent._convert_buttons_to_keyboard(buttons)
-                    if buttons
-                    else None
-                )
-                await query.edit_message_text(message, reply_markup=keyboard)
-
-            async def respond(self, message, buttons=None):
-                await self.edit(message, buttons)
-
-            async def get_sender(self):
-                return query.from_user
-
-        mock_event = MockEvent(update, self)
+        mock_event = _MockBackToMenuEvent(query, self)
         await self.event_handler.menu(mock_event)
 
     async def handle_close_menu(
@@ -661,11 +685,8 @@ class AutosumBusinessBot:
             try:
                 await self.app.updater.idle()
             except Exception:
-                # If idle fails, just wait indefinitely
-                import asyncio
-
-                while True:
-                    await asyncio.sleep(3600)  # Sleep for 1 hour at a time
+                # If idle fails, wait until stop() is called
+                await self._shutdown_event.wait()
 
         except Exception as e:
             force_log(f"Error starting AutosumBusinessBot: {e}", "AutosumBusinessBot")
@@ -686,6 +707,7 @@ class AutosumBusinessBot:
 
     async def stop(self):
         """Stop the business bot"""
+        self._shutdown_event.set()
         if self.app:
             try:
                 await self.app.updater.stop()